@@ -1,5 +1,12 @@
 import os
-import json
+import heapq
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import orjson
+import redis
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
 
 # Supabase configuration
@@ -9,7 +16,95 @@ SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 if not all([SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY]):
     raise ValueError("Missing: SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+
+# Reused across warm invocations of the function
+@lru_cache(maxsize=None)
+def get_supabase() -> Client:
+    return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+
+
+# Response cache (Redis or Vercel KV); disabled when no URL is set
+REDIS_URL = os.getenv("REDIS_URL") or os.getenv("KV_URL")
+STATS_CACHE_KEY = "stats:v1"
+STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", "120"))
+
+
+@lru_cache(maxsize=None)
+def get_redis() -> Optional[redis.Redis]:
+    if not REDIS_URL:
+        return None
+    return redis.Redis.from_url(REDIS_URL, socket_timeout=2)
+
+
+def get_cached_body() -> Optional[str]:
+    cache = get_redis()
+    if cache is None:
+        return None
+    try:
+        body = cache.get(STATS_CACHE_KEY)
+    except redis.RedisError:
+        # A cache outage should never take the endpoint down
+        return None
+    return body.decode("utf-8") if body else None
+
+
+def set_cached_body(body: str):
+    cache = get_redis()
+    if cache is None:
+        return
+    try:
+        cache.setex(STATS_CACHE_KEY, STATS_CACHE_TTL, body)
+    except redis.RedisError:
+        pass
+
+
+def aggregate_stats(repos: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Totals and language breakdown in a single pass over the rows
+    # (null languages grouped as "Unknown", same as get_repo_stats)
+    total_repos = len(repos)
+    total_stars = total_forks = total_lines = 0
+    language_stats = defaultdict(lambda: {"count": 0, "stars": 0, "forks": 0, "lines": 0})
+    for repo in repos:
+        stars = repo.get("stars", 0)
+        forks = repo.get("forks", 0)
+        lines = repo.get("lines_count", 0)
+        total_stars += stars
+        total_forks += forks
+        total_lines += lines
+
+        stats = language_stats[repo.get("language") or "Unknown"]
+        stats["count"] += 1
+        stats["stars"] += stars
+        stats["forks"] += forks
+        stats["lines"] += lines
+
+    # Get recent repos (last 20)
+    recent_repos = heapq.nlargest(20, repos, key=lambda x: x.get("created_at") or "")
+
+    return {
+        "summary": {
+            "total_repos": total_repos,
+            "total_stars": total_stars,
+            "total_forks": total_forks,
+            "total_lines": total_lines,
+        },
+        "languages": dict(language_stats),
+        "recent_repos": recent_repos,
+    }
+
+
+def fetch_stats() -> Dict[str, Any]:
+    try:
+        # Aggregated in Postgres by get_repo_stats() (see README)
+        return get_supabase().rpc("get_repo_stats").execute().data
+    except APIError:
+        # Function not installed yet: pull every row and aggregate here
+        response = get_supabase().table("repositories").select("*").execute()
+        return aggregate_stats(response.data)
+
+
+def build_stats_body() -> str:
+    return orjson.dumps({**fetch_stats(), "success": True}).decode()
 
 
 def handler(event, context=None):
@@ -17,34 +112,10 @@ def handler(event, context=None):
     API endpoint to get real-time statistics about repositories
     """
     try:
-        # Get all repositories
-        response = supabase.table("repositories").select("*").execute()
-        repos = response.data
-
-        # Calculate statistics
-        total_repos = len(repos)
-        total_stars = sum(repo.get("stars", 0) for repo in repos)
-        total_forks = sum(repo.get("forks", 0) for repo in repos)
-        total_lines = sum(repo.get("lines_count", 0) for repo in repos)
-
-        # Language breakdown
-        language_stats = {}
-        for repo in repos:
-            lang = repo.get("language", "Unknown")
-            if lang not in language_stats:
-                language_stats[lang] = {
-                    "count": 0,
-                    "stars": 0,
-                    "forks": 0,
-                    "lines": 0
-                }
-            language_stats[lang]["count"] += 1
-            language_stats[lang]["stars"] += repo.get("stars", 0)
-            language_stats[lang]["forks"] += repo.get("forks", 0)
-            language_stats[lang]["lines"] += repo.get("lines_count", 0)
-
-        # Get recent repos (last 20)
-        recent_repos = sorted(repos, key=lambda x: x.get("created_at", ""), reverse=True)[:20]
+        body = get_cached_body()
+        if body is None:
+            body = build_stats_body()
+            set_cached_body(body)
 
         return {
             "statusCode": 200,
@@ -54,17 +125,7 @@ def handler(event, context=None):
                 "Access-Control-Allow-Methods": "GET, OPTIONS",
                 "Access-Control-Allow-Headers": "Content-Type",
             },
-            "body": json.dumps({
-                "summary": {
-                    "total_repos": total_repos,
-                    "total_stars": total_stars,
-                    "total_forks": total_forks,
-                    "total_lines": total_lines,
-                },
-                "languages": language_stats,
-                "recent_repos": recent_repos,
-                "success": True
-            })
+            "body": body,
         }
 
     except Exception as e:
@@ -74,8 +135,8 @@ def handler(event, context=None):
                 "Content-Type": "application/json",
                 "Access-Control-Allow-Origin": "*",
             },
-            "body": json.dumps({
+            "body": orjson.dumps({
                 "error": str(e),
                 "success": False
-            })
+            }).decode()
         }
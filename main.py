@@ -1,40 +1,93 @@
 import os
-import json
 import time
-import base64
+import shutil
+import asyncio
+import logging
+import tempfile
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Tuple, AsyncIterator
 
-import requests
+import aiohttp
+import orjson
 from supabase import create_client, Client
 
 # -------------------------------------------------
 #  Environment variables (Vercel)
 # -------------------------------------------------
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Optional comma-separated pool of tokens to rotate through (defaults to GITHUB_TOKEN)
+GITHUB_TOKENS = [t.strip() for t in os.getenv("GITHUB_TOKENS", GITHUB_TOKEN or "").split(",") if t.strip()]
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-if not all([GITHUB_TOKEN, SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY]):
-    raise ValueError("Missing: GITHUB_TOKEN, SUPABASE_URL, or SUPABASE_SERVICE_ROLE_KEY")
+if not all([GITHUB_TOKENS, SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY]):
+    raise ValueError("Missing: GITHUB_TOKEN (or GITHUB_TOKENS), SUPABASE_URL, or SUPABASE_SERVICE_ROLE_KEY")
+
+
+# Logging: WARNING and up by default, override with LOG_LEVEL
+log = logging.getLogger("metasync")
+log.setLevel(os.getenv("LOG_LEVEL", "WARNING").upper())
+if not log.handlers:
+    _log_stream = logging.StreamHandler()
+    _log_stream.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    log.addHandler(_log_stream)
+    log.propagate = False
+
+
+# Supabase client with SERVICE ROLE (bypasses RLS), reused across warm invocations
+@lru_cache(maxsize=None)
+def get_supabase() -> Client:
+    return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
-# Supabase client with SERVICE ROLE (bypasses RLS)
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
 # GitHub constants
-HEADERS = {
-    "Accept": "application/vnd.github.v3+json",
-    "Authorization": f"token {GITHUB_TOKEN}",
-}
+ACCEPT_JSON = "application/vnd.github.v3+json"
+ACCEPT_RAW = "application/vnd.github.raw"
+# GitHub's per-token quotas as (requests, per seconds), keyed by X-RateLimit-Resource
+RATE_LIMITS = {"search": (30, 60), "core": (5000, 3600)}
 BASE_URL = "https://api.github.com"
 PER_PAGE = 100
 LANGUAGES = ["Python", "Java", "HTML", "CSS", "JavaScript", "SQL"]
+# Binary/generated files left out of line counts (lowercase, without the dot)
+SKIP_EXTENSIONS = frozenset({"png", "jpg", "gif", "pdf", "bin", "exe", "zip", "lock"})
+
+# Repos need more than this many non-blank lines to be stored
+MIN_LINES = 10
+# ASCII whitespace other than newline (as str.isspace() sees it); deleting it turns
+# blank lines into empty segments
+INLINE_WHITESPACE = b" \t\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+# Async pipeline limits
+MAX_CONNECTIONS = 50
+MAX_CONCURRENT_REPOS = 20
+MAX_CONCURRENT_SEARCHES = 2
+MAX_CONCURRENT_BLOBS = 10
+
+# Retries for transient GitHub failures (backoff doubles from RETRY_BACKOFF seconds)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1
+RETRY_STATUSES = {502, 503, 504}
+# Quota exhausted for the token used; retried once the bucket pause / rotation applies
+RATE_LIMITED_STATUSES = {403, 429}
+
+# Count lines from a shallow clone when a git binary is available (no API cost)
+GIT = shutil.which("git")
+CLONE_TIMEOUT = 60
+
+# Names per duplicate-check query (keeps PostgREST URLs short)
+EXISTS_CHUNK_SIZE = 500
+
+# Rows per Supabase insert request
+INSERT_BATCH_SIZE = 50
 
 
 # -------------------------------------------------
 #  Error Logging to Supabase
 # -------------------------------------------------
-def log_error(
+async def log_error(
     source: str,
     repo_full_name: Optional[str],
     error_type: str,
@@ -55,22 +108,151 @@ def log_error(
         "response_body": (response_body or "")[:1000] if response_body else None,
     }
     try:
-        supabase.table("error_logs").insert(payload).execute()
-        print(f"[ERROR LOGGED] {source} | {error_type} | {repo_full_name or 'N/A'}")
+        # supabase-py is synchronous; keep it off the event loop
+        await asyncio.to_thread(get_supabase().table("error_logs").insert(payload).execute)
+        log.warning("Error logged: %s | %s | %s", source, error_type, repo_full_name or "N/A")
     except Exception as e:
-        print(f"[FATAL] Failed to log error: {e}\nPayload: {payload}")
+        log.error("Failed to log error: %s\nPayload: %s", e, payload)
 
 
 # -------------------------------------------------
-#  Rate Limit Handler
+#  Token Rotation & Rate Limiting
 # -------------------------------------------------
-def handle_rate_limit(response: requests.Response):
+class TokenBucket:
+    """Paces requests to `capacity` per `period` seconds, allowing bursts up to `capacity`."""
+
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            paused = self.paused_until - time.time()
+            if paused <= 0 and self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep(max(paused, (1 - self.tokens) / self.rate))
+
+    def clamp(self, available: float):
+        """Lower the local count to what the server reports is left; never raises it."""
+        self.tokens = min(self.tokens, available)
+
+    def pause_until(self, timestamp: float) -> bool:
+        """Hold acquire() until `timestamp`; returns False if already paused at least that long."""
+        if timestamp <= self.paused_until:
+            return False
+        self.paused_until = timestamp
+        return True
+
+
+# Round-robin token pool, and the last (remaining, reset) GitHub reported per (token, resource)
+_tokens = deque(GITHUB_TOKENS)
+_rate_limits: Dict[Tuple[str, str], Tuple[int, int]] = {}
+# One bucket per resource, sized for the whole token pool
+_buckets = {
+    resource: TokenBucket(limit * len(GITHUB_TOKENS), period)
+    for resource, (limit, period) in RATE_LIMITS.items()
+}
+
+
+def reported_remaining(token: str, resource: str) -> int:
+    # Last remaining GitHub reported for this token, or the full quota if unseen / past its reset
+    limit = RATE_LIMITS.get(resource, RATE_LIMITS["core"])[0]
+    remaining, reset_time = _rate_limits.get((token, resource), (limit, 0))
+    return remaining if reset_time > time.time() else limit
+
+
+def token_available(token: str, resource: str) -> bool:
+    return reported_remaining(token, resource) > 0
+
+
+def github_headers(resource: str = "core", accept: str = ACCEPT_JSON) -> Dict[str, str]:
+    # Next token in the rotation, skipping ones that are exhausted for this resource
+    for _ in range(len(_tokens)):
+        _tokens.rotate(-1)
+        if token_available(_tokens[0], resource):
+            break
+    return {"Accept": accept, "Authorization": f"token {_tokens[0]}"}
+
+
+def update_rate_limits(response: aiohttp.ClientResponse):
+    if "X-RateLimit-Remaining" not in response.headers:
+        return
     remaining = int(response.headers.get("X-RateLimit-Remaining", 0))
     reset_time = int(response.headers.get("X-RateLimit-Reset", 0))
-    if remaining < 10:
-        sleep_sec = max(reset_time - int(time.time()), 60) + 10
-        print(f"[RATE LIMIT] Pausing {sleep_sec}s (remaining: {remaining})")
-        time.sleep(sleep_sec)
+    resource = response.headers.get("X-RateLimit-Resource", "core")
+    token = response.request_info.headers.get("Authorization", "").partition(" ")[2]
+    _rate_limits[(token, resource)] = (remaining, reset_time)
+
+    bucket = _buckets.get(resource)
+    if not bucket:
+        return
+    # Keep the bucket in step with GitHub, which also counts quota used by other clients
+    bucket.clamp(sum(reported_remaining(t, resource) for t in GITHUB_TOKENS))
+
+    # Only a spent quota on every token holds the resource, and only until the next reset
+    exhausted = remaining == 0 or response.status in RATE_LIMITED_STATUSES
+    if exhausted and not any(token_available(t, resource) for t in GITHUB_TOKENS):
+        next_reset = min(_rate_limits[(t, resource)][1] for t in GITHUB_TOKENS)
+        if bucket.pause_until(next_reset):
+            log.warning(
+                "Rate limit: holding %s for %ss (all %d tokens exhausted)",
+                resource, max(next_reset - int(time.time()), 0), len(GITHUB_TOKENS),
+            )
+
+
+# -------------------------------------------------
+#  GitHub HTTP
+# -------------------------------------------------
+@asynccontextmanager
+async def github_request(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    resource: str = "core",
+    accept: str = ACCEPT_JSON,
+    timeout: int = 10,
+    **kwargs,
+) -> AsyncIterator[aiohttp.ClientResponse]:
+    for attempt in range(MAX_RETRIES + 1):
+        await _buckets[resource].acquire()
+        try:
+            # Fresh headers per attempt so a retry can move to another token
+            response = await session.request(
+                method, url,
+                headers=github_headers(resource, accept),
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                **kwargs,
+            )
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == MAX_RETRIES:
+                raise
+        else:
+            rate_limited = (
+                response.status in RATE_LIMITED_STATUSES
+                and response.headers.get("X-RateLimit-Remaining") == "0"
+            )
+            if attempt == MAX_RETRIES or (response.status not in RETRY_STATUSES and not rate_limited):
+                break
+            response.release()
+            if rate_limited:
+                # In-flight requests can overshoot the quota before the pause lands; record
+                # the spent token and let the next acquire() rotate or wait out the pause
+                update_rate_limits(response)
+                continue
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    try:
+        update_rate_limits(response)
+        yield response
+    finally:
+        response.release()
 
 
 # -------------------------------------------------
@@ -80,8 +262,11 @@ def yesterday_str() -> str:
     return (datetime.utcnow() - timedelta(days=1)).strftime("%Y-%m-%d")
 
 
-def search_repos(lang: str, date_str: str) -> List[Dict[str, Any]]:
+async def search_repos(
+    session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, lang: str, date_str: str
+) -> List[Dict[str, Any]]:
     repos: List[Dict[str, Any]] = []
+    url = f"{BASE_URL}/search/repositories"
     page = 1
     while len(repos) < 1000:
         query = f'language:{lang} created:{date_str}'
@@ -93,133 +278,246 @@ def search_repos(lang: str, date_str: str) -> List[Dict[str, Any]]:
             "page": page,
         }
         try:
-            r = requests.get(f"{BASE_URL}/search/repositories", headers=HEADERS, params=params, timeout=15)
-            r.raise_for_status()
-            handle_rate_limit(r)
-        except requests.exceptions.RequestException as e:
-            log_error(
+            # Shared across languages to stay under the search secondary rate limit
+            async with semaphore, github_request(
+                session, "GET", url, resource="search", timeout=15, params=params
+            ) as r:
+                if r.status >= 400:
+                    await log_error(
+                        source="search",
+                        repo_full_name=None,
+                        error_type="RequestError",
+                        error_message=f"GET returned {r.status}",
+                        request_url=str(r.url),
+                        request_method="GET",
+                        response_status=r.status,
+                        response_body=await r.text(),
+                    )
+                    break
+                data = orjson.loads(await r.read())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            await log_error(
                 source="search",
                 repo_full_name=None,
                 error_type="RequestError",
-                error_message=str(e),
-                request_url=e.request.url if hasattr(e, 'request') and e.request else None,
+                error_message=str(e) or type(e).__name__,
+                request_url=url,
                 request_method="GET",
-                response_status=getattr(e.response, 'status_code', None) if hasattr(e, 'response') else None,
-                response_body=getattr(e.response, 'text', None) if hasattr(e, 'response') else None,
             )
             break
 
-        data = r.json()
         items = data.get("items", [])
         if not items:
             break
 
         repos.extend(items)
-        print(f"[INFO] {lang} page {page}: +{len(items)} (total {len(repos)})")
+        log.info("%s page %d: +%d (total %d)", lang, page, len(items), len(repos))
 
         page += 1
-        time.sleep(2)
     return [repo for repo in repos if repo.get("size", 0) > 0]
 
 
-def has_readme(full_name: str) -> bool:
+async def has_readme(session: aiohttp.ClientSession, full_name: str) -> bool:
     url = f"{BASE_URL}/repos/{full_name}/contents/README.md"
     try:
-        r = requests.head(url, headers=HEADERS, timeout=10)
-        if r.status_code == 200:
-            return True
-        elif r.status_code == 404:
-            return False
-        else:
-            log_error(
-                source="readme_check",
-                repo_full_name=full_name,
-                error_type="UnexpectedStatus",
-                error_message=f"HEAD returned {r.status_code}",
-                request_url=url,
-                request_method="HEAD",
-                response_status=r.status_code,
-            )
-            return False
-    except requests.exceptions.RequestException as e:
-        log_error(
+        async with github_request(session, "HEAD", url) as r:
+            if r.status == 200:
+                return True
+            elif r.status == 404:
+                return False
+            else:
+                await log_error(
+                    source="readme_check",
+                    repo_full_name=full_name,
+                    error_type="UnexpectedStatus",
+                    error_message=f"HEAD returned {r.status}",
+                    request_url=url,
+                    request_method="HEAD",
+                    response_status=r.status,
+                )
+                return False
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        await log_error(
             source="readme_check",
             repo_full_name=full_name,
             error_type="RequestError",
-            error_message=str(e),
+            error_message=str(e) or type(e).__name__,
             request_url=url,
             request_method="HEAD",
-            response_status=getattr(e.response, 'status_code', None),
         )
         return False
 
 
-def count_lines(full_name: str, default_branch: str = "main") -> int:
+def count_non_blank_lines(content: bytes) -> int:
+    if not content.isascii():
+        # Unicode whitespace (NBSP, U+3000, ...) and undecodable bytes count as blank
+        text = content.decode("utf-8", errors="ignore")
+        return sum(1 for line in text.split("\n") if line and not line.isspace())
+    # ASCII (most source files) stays on raw bytes: translate/split/count all run in C
+    segments = content.translate(None, INLINE_WHITESPACE).split(b"\n")
+    return len(segments) - segments.count(b"")
+
+
+async def fetch_blob(
+    session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, full_name: str, sha: str
+) -> Optional[bytes]:
+    # Raw blob by SHA: no base64/JSON envelope to unwrap
+    blob_url = f"{BASE_URL}/repos/{full_name}/git/blobs/{sha}"
+    async with semaphore, github_request(session, "GET", blob_url, accept=ACCEPT_RAW) as blob_r:
+        if blob_r.status != 200:
+            return None
+        return await blob_r.read()
+
+
+def count_local_lines(root: str) -> Tuple[int, bool]:
+    found_readme = any(
+        name.lower() == "readme.md" and os.path.isfile(os.path.join(root, name))
+        for name in os.listdir(root)
+    )
+    lines = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != ".git"]
+        for name in filenames:
+            _, dot, ext = name.rpartition(".")
+            if dot and ext.lower() in SKIP_EXTENSIONS:
+                continue
+            path = os.path.join(dirpath, name)
+            if os.path.islink(path):
+                continue
+            with open(path, "rb") as f:
+                lines += count_non_blank_lines(f.read())
+    return lines, found_readme
+
+
+async def count_lines_via_clone(full_name: str, default_branch: str = "main") -> Optional[Tuple[int, bool]]:
+    # Public repos clone anonymously, so no token ends up in argv or .git/config
+    url = f"https://github.com/{full_name}.git"
+    try:
+        with tempfile.TemporaryDirectory(prefix="metasync-") as workdir:
+            proc = await asyncio.create_subprocess_exec(
+                GIT, "clone", "--depth=1", "--single-branch", "--no-tags", "--quiet",
+                "--branch", default_branch, url, workdir,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+            )
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), timeout=CLONE_TIMEOUT)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                stderr = f"Timed out after {CLONE_TIMEOUT}s".encode()
+            if proc.returncode == 0:
+                return await asyncio.to_thread(count_local_lines, workdir)
+            error_message = stderr.decode("utf-8", errors="replace").strip()
+    except OSError as e:
+        # e.g. EMFILE/ENOMEM spawning git, or a checkout file that can't be read
+        error_message = str(e)
+
+    await log_error(
+        source="line_count",
+        repo_full_name=full_name,
+        error_type="CloneError",
+        error_message=error_message,
+        request_url=url,
+    )
+    return None
+
+
+async def count_lines(
+    session: aiohttp.ClientSession,
+    full_name: str,
+    default_branch: str = "main",
+) -> Tuple[int, bool]:
+    # Returns (non-blank lines, whether a README.md sits at the repo root)
+    if GIT:
+        # One bulk transfer instead of a request per blob
+        result = await count_lines_via_clone(full_name, default_branch)
+        if result is not None:
+            return result
+    return await count_lines_via_api(session, full_name, default_branch)
+
+
+async def count_lines_via_api(
+    session: aiohttp.ClientSession,
+    full_name: str,
+    default_branch: str = "main",
+) -> Tuple[int, bool]:
     lines = 0
+    found_readme = False
     branch_url = f"{BASE_URL}/repos/{full_name}/git/refs/heads/{default_branch}"
     try:
-        br = requests.get(branch_url, headers=HEADERS, timeout=10)
-        br.raise_for_status()
-        tree_sha = br.json().get("object", {}).get("sha")
+        async with github_request(session, "GET", branch_url) as br:
+            br.raise_for_status()
+            tree_sha = orjson.loads(await br.read()).get("object", {}).get("sha")
         if not tree_sha:
-            return 0
+            return 0, False
     except Exception as e:
-        log_error(
+        await log_error(
             source="line_count",
             repo_full_name=full_name,
             error_type="BranchError",
             error_message=str(e),
             request_url=branch_url,
         )
-        return 0
+        return 0, False
 
     tree_url = f"{BASE_URL}/repos/{full_name}/git/trees/{tree_sha}?recursive=1"
     try:
-        tree_r = requests.get(tree_url, headers=HEADERS, timeout=15)
-        tree_r.raise_for_status()
-        for node in tree_r.json().get("tree", []):
+        async with github_request(session, "GET", tree_url, timeout=15) as tree_r:
+            tree_r.raise_for_status()
+            tree = orjson.loads(await tree_r.read()).get("tree", [])
+        shas: List[str] = []
+        for node in tree:
             if node["type"] != "blob":
                 continue
-            path = node["path"].lower()
-            if path.endswith((".png", ".jpg", ".gif", ".pdf", ".bin", ".exe", ".zip", ".lock")):
-                continue
-            content_url = f"{BASE_URL}/repos/{full_name}/contents/{node['path']}"
-            content_r = requests.get(content_url, headers=HEADERS, timeout=10)
-            if content_r.status_code != 200:
-                continue
-            try:
-                raw = base64.b64decode(content_r.json()["content"]).decode("utf-8", errors="ignore")
-                lines += sum(1 for line in raw.split("\n") if line.strip())
-            except Exception as e:
-                # Skip files that can't be decoded or parsed
+            if node["path"].lower() == "readme.md":
+                found_readme = True
+            _, dot, ext = node["path"].rpartition(".")
+            if dot and ext.lower() in SKIP_EXTENSIONS:
                 continue
+            shas.append(node["sha"])
+        if not found_readme:
+            # Repo will be rejected anyway; don't spend blob fetches on it
+            return 0, False
+
+        # Fetch every blob concurrently; the semaphore keeps MAX_CONCURRENT_BLOBS in
+        # flight, so a slow blob only holds its own slot
+        blob_semaphore = asyncio.Semaphore(MAX_CONCURRENT_BLOBS)
+        contents = await asyncio.gather(*(fetch_blob(session, blob_semaphore, full_name, sha) for sha in shas))
+        lines = sum(count_non_blank_lines(content) for content in contents if content is not None)
     except Exception as e:
-        log_error(
+        await log_error(
             source="line_count",
             repo_full_name=full_name,
             error_type="TreeError",
             error_message=str(e),
             request_url=tree_url,
         )
-    return lines
+    return lines, found_readme
 
 
-def repo_exists(full_name: str) -> bool:
-    try:
-        resp = supabase.table("repositories").select("full_name").eq("full_name", full_name).limit(1).execute()
-        return bool(resp.data)
-    except Exception as e:
-        log_error(
-            source="duplicate_check",
-            repo_full_name=full_name,
-            error_type="SupabaseError",
-            error_message=str(e),
-        )
-        return False
+async def existing_repos(names: List[str]) -> Set[str]:
+    existing: Set[str] = set()
+    for i in range(0, len(names), EXISTS_CHUNK_SIZE):
+        chunk = names[i:i + EXISTS_CHUNK_SIZE]
+        try:
+            query = get_supabase().table("repositories").select("full_name").in_("full_name", chunk)
+            # supabase-py is synchronous; keep it off the event loop
+            resp = await asyncio.to_thread(query.execute)
+            existing.update(row["full_name"] for row in resp.data)
+        except Exception as e:
+            await log_error(
+                source="duplicate_check",
+                repo_full_name=None,
+                error_type="SupabaseError",
+                error_message=f"Batch of {len(chunk)} names failed: {e}",
+            )
+    return existing
 
 
-def insert_repo(repo: Dict[str, Any], lines: int) -> bool:
-    payload = {
+def build_payload(repo: Dict[str, Any], lines: int) -> Dict[str, Any]:
+    return {
         "full_name": repo["full_name"],
         "name": repo["name"],
         "description": repo.get("description") or "",
@@ -232,17 +530,111 @@ def insert_repo(repo: Dict[str, Any], lines: int) -> bool:
         "has_readme": True,
         "lines_count": lines,
     }
+
+
+async def insert_repos(payloads: List[Dict[str, Any]]) -> int:
+    if not payloads:
+        return 0
     try:
-        supabase.table("repositories").insert(payload).execute()
-        return True
+        await asyncio.to_thread(get_supabase().table("repositories").insert(payloads).execute)
+        return len(payloads)
+    except Exception:
+        # Retry row by row so one bad payload doesn't drop the whole batch
+        pass
+
+    inserted = 0
+    for payload in payloads:
+        try:
+            await asyncio.to_thread(get_supabase().table("repositories").insert(payload).execute)
+            inserted += 1
+        except Exception as e:
+            await log_error(
+                source="insert_repo",
+                repo_full_name=payload["full_name"],
+                error_type="SupabaseInsertError",
+                error_message=str(e),
+            )
+    return inserted
+
+
+async def process_repo(
+    session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, repo: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    full_name = repo["full_name"]
+    async with semaphore:
+        if repo["size"] > 500:
+            if not await has_readme(session, full_name):
+                return None
+            lines = repo["size"] // 50
+        else:
+            # The tree walk already shows whether there is a README, so no separate probe
+            lines, found_readme = await count_lines(session, full_name, repo.get("default_branch", "main"))
+            if not found_readme:
+                return None
+        if lines <= MIN_LINES:
+            return None
+
+        return build_payload(repo, lines)
+
+
+async def sync_language(
+    session: aiohttp.ClientSession,
+    search_semaphore: asyncio.Semaphore,
+    repo_semaphore: asyncio.Semaphore,
+    seen: Set[str],
+    lang: str,
+    date_str: str,
+) -> int:
+    try:
+        candidates = await search_repos(session, search_semaphore, lang, date_str)
     except Exception as e:
-        log_error(
-            source="insert_repo",
-            repo_full_name=repo["full_name"],
-            error_type="SupabaseInsertError",
-            error_message=str(e),
-        )
-        return False
+        await log_error("search_loop", None, "Critical", f"Failed to search {lang}: {e}")
+        return 0
+
+    # Skip repos already picked up this run (by another language or an earlier page)
+    fresh: List[Dict[str, Any]] = []
+    for repo in candidates:
+        if repo["full_name"] not in seen:
+            seen.add(repo["full_name"])
+            fresh.append(repo)
+
+    existing = await existing_repos([repo["full_name"] for repo in fresh])
+
+    inserted = 0
+    pending: List[Dict[str, Any]] = []
+    tasks = [
+        process_repo(session, repo_semaphore, repo)
+        for repo in fresh
+        if repo["full_name"] not in existing
+    ]
+    for idx, task in enumerate(asyncio.as_completed(tasks), 1):
+        payload = await task
+        if payload:
+            pending.append(payload)
+        if len(pending) >= INSERT_BATCH_SIZE:
+            inserted += await insert_repos(pending)
+            pending = []
+
+        if idx % 50 == 0:
+            log.debug("%s: checked %d/%d", lang, idx, len(tasks))
+
+    inserted += await insert_repos(pending)
+    log.info("%s: inserted %d repos", lang, inserted)
+    return inserted
+
+
+async def handler_async(date_str: str) -> int:
+    search_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+    repo_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REPOS)
+    seen: Set[str] = set()
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Languages are independent sweeps, so run them side by side
+        results = await asyncio.gather(*(
+            sync_language(session, search_semaphore, repo_semaphore, seen, lang, date_str)
+            for lang in LANGUAGES
+        ))
+    return sum(results)
 
 
 # -------------------------------------------------
@@ -262,46 +654,10 @@ def handler(event, context=None):
         }
 
     date_str = yesterday_str()
-    print(f"\n=== FETCHING REPOS FOR {date_str} ===")
-
-    total_inserted = 0
-    for lang in LANGUAGES:
-        print(f"\n--- PROCESSING {lang} ---")
-        try:
-            candidates = search_repos(lang, date_str)
-        except Exception as e:
-            log_error("search_loop", None, "Critical", f"Failed to search {lang}: {e}")
-            continue
-
-        inserted_lang = 0
-        for idx, repo in enumerate(candidates, 1):
-            full_name = repo["full_name"]
-
-            if idx % 50 == 0:
-                print(f"  → checked {idx}/{len(candidates)}")
-
-            if repo_exists(full_name):
-                continue
-
-            if not has_readme(full_name):
-                continue
-
-            if repo["size"] > 500:
-                lines = repo["size"] // 50
-            else:
-                lines = count_lines(full_name, repo.get("default_branch", "main"))
-            if lines <= 10:
-                continue
-
-            if insert_repo(repo, lines):
-                inserted_lang += 1
-                total_inserted += 1
-
-            time.sleep(0.5)
-
-        print(f"  → inserted {inserted_lang} repos for {lang}")
+    log.info("=== FETCHING REPOS FOR %s ===", date_str)
+    total_inserted = asyncio.run(handler_async(date_str))
+    log.info("=== DONE | TOTAL INSERTED: %d ===", total_inserted)
 
-    print(f"\n=== DONE | TOTAL INSERTED: {total_inserted} ===")
     return {
         "statusCode": 200,
         "headers": {
@@ -310,5 +666,5 @@ def handler(event, context=None):
             "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
             "Access-Control-Allow-Headers": "Content-Type, Authorization",
         },
-        "body": json.dumps({"date": date_str, "inserted": total_inserted}),
+        "body": orjson.dumps({"date": date_str, "inserted": total_inserted}).decode(),
     }